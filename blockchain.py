@@ -1,100 +1,210 @@
-import json
-import logging
+import array
+import concurrent.futures
+import functools
+import hashlib
 import os
 import time
-from copy import deepcopy
 
-import cryptography
 from cryptography.exceptions import InvalidSignature
-from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 import gzip
 import struct
-import sys
+
+try:
+    import nacl.exceptions
+    import nacl.signing
+    USE_NACL = True  # libsodium is faster per sign/verify, cryptography is kept as a fallback
+except ImportError:
+    USE_NACL = False
+
+try:
+    import zstandard  # Only needed for .zst blockchain files
+except ImportError:
+    zstandard = None
+
+# Public Key (32 bytes), Index (8 bytes), Previous Hash (32 bytes), Timestamp (8 bytes)
+_HEADER = struct.Struct('>32sQ32sd')
+# Block size prefix used in dumps
+_LEN = struct.Struct('>I')
+# Signatures, keys and hashes are incompressible, so higher gzip levels cost CPU for next to no size gain
+_GZIP_LEVEL = 1
+_READ_BUFFER_SIZE = 128 * 1024
+_ZSTD_LEVEL = 3
+
+
+def _zstd():
+    assert zstandard is not None, '.zst blockchain files require the zstandard package'
+    return zstandard
 
 
 def generate_private_key() -> bytes:
+    if USE_NACL:
+        return nacl.signing.SigningKey.generate().encode()
     return Ed25519PrivateKey.generate().private_bytes_raw()
 
 
+@functools.lru_cache(maxsize=1024)
+def _load_private_key(private_bytes: bytes):
+    if USE_NACL:
+        return nacl.signing.SigningKey(private_bytes)
+    return Ed25519PrivateKey.from_private_bytes(private_bytes)
+
+
+@functools.lru_cache(maxsize=1024)
+def _load_public_key(public_bytes: bytes):
+    if USE_NACL:
+        return nacl.signing.VerifyKey(public_bytes)
+    return Ed25519PublicKey.from_public_bytes(public_bytes)
+
+
 def generate_public_key(private_bytes: bytes) -> bytes:
-    private_key = Ed25519PrivateKey.from_private_bytes(private_bytes)
+    private_key = _load_private_key(private_bytes)
+    if USE_NACL:
+        return private_key.verify_key.encode()
     return private_key.public_key().public_bytes_raw()
 
 
 def sign(data: bytes, private_bytes: bytes) -> bytes:
-    private_key = Ed25519PrivateKey.from_private_bytes(private_bytes)
+    private_key = _load_private_key(private_bytes)
+    if USE_NACL:
+        return private_key.sign(data).signature
     return private_key.sign(data)
 
 
 def verify(data: bytes, signature: bytes, public_bytes: bytes):
-    public_key = Ed25519PublicKey.from_public_bytes(public_bytes)
+    public_key = _load_public_key(public_bytes)
+    if USE_NACL:
+        try:
+            public_key.verify(data, signature)
+        except nacl.exceptions.BadSignatureError:
+            raise InvalidSignature()  # Callers only deal with cryptography's exception
+        return
     public_key.verify(signature, data)
 
 
 def sha256(data: bytes) -> bytes:
-    hash_ = hashes.Hash(hashes.SHA256())
-    hash_.update(data)
-    return hash_.finalize()
+    return hashlib.sha256(data).digest()
 
 
 class Block:
+    # Blocks are immutable apart from data, which may be reassigned while assembling, so they never need copying
+    __slots__ = ('_data', '_index', '_previous_hash', '_timestamp', '_public_key', '_signature', '_hash_cache',
+                 '_signed_bytes')
+
     @classmethod
     def verify(cls, block: bytes, public_key: bytes):
-        signature = block[:64]
+        block = memoryview(block)
+        signature = bytes(block[:64])
         verify(sha256(block[64:]), signature, public_key)
 
     @classmethod
-    def deserialize(cls, block: bytes) -> 'Block':
-        signature = block[:64]
-        public_key = block[64:96]
-        cls.verify(block, public_key)
-        index = struct.unpack_from('>Q', block, 96)[0]
-        previous_hash = block[104:136]
-        timestamp = struct.unpack_from('>d', block, 136)[0]
-        data = block[144:]
-        return Block(data, index, previous_hash, public_key, timestamp, signature)
+    def deserialize(cls, block: bytes, skip_verify: bool = False) -> 'Block':
+        # skip_verify is only meant for callers that check the signature themselves (see Blockchain.from_dump)
+        block = memoryview(block)
+        signature = bytes(block[:64])
+        public_key, index, previous_hash, timestamp = _HEADER.unpack_from(block, 64)
+        if not skip_verify:
+            cls.verify(block, public_key)
+        data = bytes(block[64 + _HEADER.size:])
+        return cls.new(data, index, previous_hash, public_key, timestamp, signature)  # Sizes fixed by _HEADER
+
+    @classmethod
+    def new(cls, data: bytes, index: int, previous_hash: bytes, public_key: bytes, timestamp: float,
+            signature: bytes = None) -> 'Block':
+        # Same as Block(...) but fills the slots directly, skipping the size checks and property setters.
+        # Only for callers that already guarantee 32 byte hashes and keys.
+        block = cls.__new__(cls)
+        block._data = data
+        block._index = index
+        block._previous_hash = previous_hash
+        block._timestamp = timestamp
+        block._public_key = public_key
+        block._signature = signature
+        block._hash_cache = None
+        block._signed_bytes = None
+        return block
 
     def __init__(self, data: bytes, index: int, previous_hash: bytes, public_key: bytes, timestamp: float,
                  signature: bytes = None):
         assert len(previous_hash) == 32, 'Invalid Hash'
         assert len(public_key) == 32, 'Invalid Public Key'
 
+        # Header fields are read-only, so the memoized hash and signed bytes can't go stale through them.
+        # The hash is memoized, so the header is only packed again once data is reassigned.
+        self._index = index
+        self._previous_hash = previous_hash
+        self._timestamp = timestamp
+        self._public_key = public_key
+        # Data may be reassigned while a block is being assembled, which drops the caches and signature.
         self.data = data
-        self.index = index
-        self.previous_hash = previous_hash
-        self.timestamp = timestamp
-        self.public_key = public_key
         self.signature = signature
 
-    def __serialize_inner(self):
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def previous_hash(self) -> bytes:
+        return self._previous_hash
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+    @property
+    def public_key(self) -> bytes:
+        return self._public_key
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    @data.setter
+    def data(self, data: bytes):
+        self._data = data
+        self._hash_cache = None
+        self.signature = None  # No longer covers the data
+
+    @property
+    def signature(self) -> bytes:
+        return self._signature
+
+    @signature.setter
+    def signature(self, signature: bytes):
+        self._signature = signature
+        self._signed_bytes = None
+
+    def __serialize_header(self):
+        return _HEADER.pack(self.public_key, self.index, self.previous_hash, self.timestamp)
+
+    def hash(self):
         # Block Format (No signature):
+        # Public Key: Bytestring (32 bytes)
         # Index: Unsigned Long Long (8 bytes)
         # Previous Hash: Bytestring (32 bytes)
-        # Public Key: Bytestring (32 bytes)
         # Timestamp: Double (8 bytes)
         # Data: Bytestring
-        result = self.public_key
-        result += struct.pack('>Q', self.index)
-        result += self.previous_hash
-        result += struct.pack('>d', self.timestamp)
-        result += self.data
-        return result
-
-    def hash(self):
-        return sha256(self.__serialize_inner())
+        if self._hash_cache is None:
+            # Header and data are fed separately, so the body is never concatenated just to be hashed.
+            # The hash state is local, so no OpenSSL context outlives the call.
+            hash_ = hashlib.sha256(self.__serialize_header())
+            hash_.update(self.data)
+            self._hash_cache = hash_.digest()
+        return self._hash_cache
 
     def sign(self, private_key: bytes) -> bytes:
         # Block Format (Signature)
         # Signature (64 bytes)
         # ... Block ...
         self.signature = sign(self.hash(), private_bytes=private_key)
+        self.serialize()  # Assembles the signed bytes once, up front
 
     def serialize(self):
+        # The signature is produced by sign() or checked on deserialize, so it isn't verified again here
         assert self.signature is not None, 'Block needs to be signed before it can be serialized'
-        result = self.signature + self.__serialize_inner()
-        self.verify(result, self.public_key)
-        return result
+        if self._signed_bytes is None:
+            self._signed_bytes = self.signature + self.__serialize_header() + self.data
+        return self._signed_bytes
 
     def __repr__(self):
         return f'Block({self.index}, b\'...{str(self.previous_hash[-8:])[2:-1]}\', {self.timestamp}, {self.data})'
@@ -111,45 +221,239 @@ class Blockchain:
             blockchain = Blockchain()
             blockchain.add_block_zero()
             return blockchain
-        with gzip.open(path, 'rb') as rf:
-            return cls.from_dump(rf.read())
+        # Decompress and parse chunk by chunk, so only a partial block is ever kept around as raw bytes
+        blockchain = Blockchain()
+        buffer = bytearray()
+        with open(path, 'rb', buffering=_READ_BUFFER_SIZE) as f, cls._decompressed(path, f) as rf, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            while True:
+                chunk = rf.read(_READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+                del buffer[:blockchain._extend_from_dump(buffer, executor)]
+        assert not buffer, 'Truncated blockchain dump'
+        return blockchain
+
+    @staticmethod
+    def _decompressed(path: str, f):
+        # Blockchain files are gzip, or a zstd frame if the path ends in .zst
+        if path.endswith('.zst'):
+            return _zstd().ZstdDecompressor().stream_reader(f)
+        return gzip.GzipFile(fileobj=f, mode='rb')
 
     @classmethod
     def from_dump(cls, dump: bytes):
         blockchain = Blockchain()
-        while dump:
-            block_size = struct.unpack('>I', dump[:4])[0]
-            block = dump[4:4 + block_size]
-            dump = dump[4 + block_size:]
-            blockchain.add_block(block)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            assert blockchain._extend_from_dump(dump, executor) == len(dump), 'Truncated blockchain dump'
         return blockchain
 
-    @classmethod
-    def verify(cls, blocks: list):
-        prev_block: Block = None
+    def _extend_from_dump(self, dump: bytes, executor: concurrent.futures.Executor) -> int:
+        # Adds every complete block in dump and returns how many bytes were consumed.
+        # Must only be used on a blockchain that is discarded if this raises (see load / from_dump),
+        # since blocks are appended before all of their signatures are known to be valid.
+        dump = memoryview(dump)
+        blocks = []
+        offset = 0
+        while offset + _LEN.size <= len(dump):
+            block_size = _LEN.unpack_from(dump, offset)[0]
+            end = offset + _LEN.size + block_size
+            if end > len(dump):
+                break
+            blocks.append(Block.deserialize(dump[offset + _LEN.size:end], skip_verify=True))
+            offset = end
+        dump.release()
+        # The sequential structural checks run here while the pool checks signatures
+        futures = self._batch_verify(blocks, executor)
         for block in blocks:
-            # General block checks
-            assert block.timestamp < time.time()
-            if prev_block is None:
-                prev_block = block
-                assert block.index >= 0
-                continue
-            # Checks with previous block
-            assert block.index == prev_block.index + 1
-            assert block.previous_hash == prev_block.hash()
-            assert block.timestamp >= prev_block.timestamp
+            self._append(block, signature_checked=True)
+        for future in futures:
+            future.result()  # Raises InvalidSignature
+        return offset
 
-    def __init__(self):
+    def _batch_verify(self, blocks: list, executor: concurrent.futures.Executor) -> list:
+        # There is no batch Ed25519 API, but verification releases the GIL, so signatures are checked
+        # in parallel. The signed message is the memoized block hash, which the structural checks reuse.
+        return [executor.submit(verify, block.hash(), block.signature, block.public_key) for block in blocks]
+
+    def __init__(self, merkle_min_level: int = 1, merkle_memoize_every: int = 1):
         self.blocks: list[Block] = []
+        # Blocks by their own index, so partial chains that don't start at zero can be looked up
+        self._by_index: dict[int, Block] = {}
+        # Merkle tree over block hashes, level 0 being the leaves. Only levels >= merkle_min_level and then
+        # every merkle_memoize_every-th level are stored, the rest is recomputed when needed. The leaves are
+        # already memoized by Block.hash(), so they aren't stored by default.
+        assert merkle_min_level >= 0, 'merkle_min_level must not be negative'
+        assert merkle_memoize_every >= 1, 'merkle_memoize_every must be at least 1'
+        self._merkle_min_level = merkle_min_level
+        self._merkle_memoize_every = merkle_memoize_every
+        self._merkle_levels: dict[int, list[bytes]] = {}
+        self._merkle_root: bytes = None
+        # Fixed-size fields of self.blocks as parallel arrays, so chain-wide checks don't touch Block objects
+        self._indices = array.array('Q')
+        self._timestamps = array.array('d')
+        self._hashes = bytearray()  # 32 bytes per block
+        self._prev_hashes = bytearray()  # 32 bytes per block
 
     def add_block(self, block: bytes):
-        block_obj = Block.deserialize(block)
+        # Signature is checked once in _append, after the cheap structural checks
+        self._append(Block.deserialize(block, skip_verify=True))
+
+    def add_blocks(self, blocks: list):
+        # Same as calling add_block for each block, but the signatures are checked together on a pool once
+        # every block has passed the cheap structural checks. Nothing is added if any check fails.
+        block_objs = [Block.deserialize(block, skip_verify=True) for block in blocks]
+        length = len(self.blocks)
+        merkle_state = self._merkle_state()
+        try:
+            for block_obj in block_objs:
+                self._append(block_obj, signature_checked=True)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for future in self._batch_verify(block_objs, executor):
+                    future.result()  # Raises InvalidSignature
+        except Exception as e:
+            self._truncate(length, merkle_state)
+            raise e
+
+    def _append(self, block_obj: Block, signature_checked: bool = False):
         self.blocks.append(block_obj)
         try:
-            self.verify(self.blocks[-2:])  # Check with accordance to previous block
+            # Check with accordance to previous block
+            self._check_block(len(self._indices), block_obj.index, block_obj.timestamp, block_obj.previous_hash,
+                              time.time())
+            if not signature_checked:
+                verify(block_obj.hash(), block_obj.signature, block_obj.public_key)
         except Exception as e:
             self.blocks.pop()
             raise e
+        self._by_index[block_obj.index] = block_obj
+        self._record(block_obj)
+        self._merkle_append(block_obj.hash())
+
+    def _truncate(self, length: int, merkle_state: tuple):
+        # Drops every block from position length on, restoring the Merkle tree saved by _merkle_state
+        for block_obj in self.blocks[length:]:
+            del self._by_index[block_obj.index]
+        del self.blocks[length:]
+        del self._indices[length:]
+        del self._timestamps[length:]
+        del self._hashes[32 * length:]
+        del self._prev_hashes[32 * length:]
+        levels, self._merkle_root = merkle_state
+        for level in list(self._merkle_levels):
+            if level not in levels:
+                del self._merkle_levels[level]
+                continue
+            nodes = self._merkle_levels[level]
+            del nodes[levels[level][0]:]
+            nodes[-1] = levels[level][1]
+
+    def _record(self, block_obj: Block):
+        self._indices.append(block_obj.index)
+        self._timestamps.append(block_obj.timestamp)
+        self._hashes += block_obj.hash()
+        self._prev_hashes += block_obj.previous_hash
+
+    def _check_block(self, position: int, index: int, timestamp: float, previous_hash: bytes, now: float):
+        # The chain rules for a block at position, checked against the block before it in the parallel arrays
+        assert timestamp < now
+        if position == 0:
+            assert index >= 0
+            return
+        assert index == self._indices[position - 1] + 1
+        with memoryview(self._hashes) as hashes:  # Released right away, so self._hashes can still grow
+            assert previous_hash == hashes[32 * position - 32:32 * position]
+        assert timestamp >= self._timestamps[position - 1]
+
+    @classmethod
+    def verify(cls, blocks: list):
+        # Checks the chain rules over a list of Block objects, without their signatures
+        blockchain = cls()
+        for block in blocks:
+            blockchain._record(block)
+        blockchain.verify_chain()
+
+    def verify_chain(self):
+        # Re-checks the chain rules over the whole chain, using only the parallel arrays
+        now = time.time()
+        prev_hashes = memoryview(self._prev_hashes)
+        for position in range(len(self._indices)):
+            self._check_block(position, self._indices[position], self._timestamps[position],
+                              prev_hashes[32 * position:32 * position + 32], now)
+
+    def _merkle_memoized(self, level: int) -> bool:
+        return level >= self._merkle_min_level and (level - self._merkle_min_level) % self._merkle_memoize_every == 0
+
+    def _merkle_width(self, level: int) -> int:
+        return (len(self.blocks) + (1 << level) - 1) >> level
+
+    def _merkle_node(self, level: int, position: int) -> bytes:
+        # Nodes on levels that aren't memoized are rebuilt from the closest memoized level below
+        if level in self._merkle_levels:
+            return self._merkle_levels[level][position]
+        if level == 0:
+            return self.blocks[position].hash()
+        left = self._merkle_node(level - 1, 2 * position)
+        if 2 * position + 1 < self._merkle_width(level - 1):
+            right = self._merkle_node(level - 1, 2 * position + 1)
+        else:
+            right = left  # Odd count: duplicate last
+        return sha256(left + right)
+
+    def _merkle_state(self) -> tuple:
+        # Appends only add nodes or replace the last node of a level, so the length and last node of each level
+        # are enough to undo them
+        return {level: (len(nodes), nodes[-1]) for level, nodes in self._merkle_levels.items()}, self._merkle_root
+
+    def _merkle_append(self, leaf: bytes):
+        # Only the right spine up from the new leaf changes, so an append is O(log N)
+        # when every level is memoized. Called after the block has been appended to self.blocks.
+        position = len(self.blocks) - 1
+        top = position.bit_length()
+        node = leaf
+        for level in range(top + 1):
+            if level > 0:
+                child = position >> (level - 1)
+                if child % 2 == 0:
+                    node = sha256(node + node)  # The spine is always the last node, so it has no right sibling
+                else:
+                    node = sha256(self._merkle_node(level - 1, child - 1) + node)
+            if self._merkle_memoized(level):
+                nodes = self._merkle_levels.setdefault(level, [])
+                if position >> level == len(nodes):
+                    nodes.append(node)
+                else:
+                    nodes[position >> level] = node
+        self._merkle_root = node
+
+    @property
+    def merkle_root(self) -> bytes:
+        return self._merkle_root
+
+    def merkle_position(self, index: int) -> int:
+        # Leaf position of a block in the Merkle tree, i.e. its offset from the first block of this chain
+        self.get_block(index)  # Raises IndexError for unknown blocks
+        return index - self.blocks[0].index
+
+    def merkle_proof(self, index: int) -> list[bytes]:
+        # Sibling hashes from the leaf up to (excluding) the root, checked against merkle_position(index)
+        position = self.merkle_position(index)
+        proof = []
+        for level in range((len(self.blocks) - 1).bit_length()):
+            sibling = position ^ 1
+            proof.append(self._merkle_node(level, sibling if sibling < self._merkle_width(level) else position))
+            position //= 2
+        return proof
+
+    @staticmethod
+    def verify_merkle_proof(leaf: bytes, position: int, proof: list[bytes], root: bytes):
+        # position is the block's offset from the first block of the chain that produced the proof
+        node = leaf
+        for sibling in proof:
+            node = sha256(node + sibling) if position % 2 == 0 else sha256(sibling + node)
+            position //= 2
+        assert node == root, 'Merkle proof does not match root'
 
     def add_block_zero(self):
         private_key = generate_private_key()  # Discarded
@@ -171,22 +475,26 @@ class Blockchain:
         return self.last_block.hash()
 
     def dump(self) -> bytes:
-        result = b''
+        parts = []
         for block in self.blocks:
             block_bytes = block.serialize()
-            result += struct.pack(f'>I', len(block_bytes))
-            result += block_bytes
-        return result
+            parts.append(_LEN.pack(len(block_bytes)))
+            parts.append(block_bytes)
+        return b''.join(parts)
 
     def save(self, path: str):
-        with gzip.open(path, 'wb') as wf:
+        if path.endswith('.zst'):
+            with open(path, 'wb') as f, _zstd().ZstdCompressor(level=_ZSTD_LEVEL).stream_writer(f) as wf:
+                wf.write(self.dump())
+            return
+        with gzip.open(path, 'wb', compresslevel=_GZIP_LEVEL) as wf:
             wf.write(self.dump())
 
     def get_block(self, index: int):
-        # TODO: Binary search for partial blockchain support
-        block = self.blocks[index]
-        assert block.index == index
-        return block
+        try:
+            return self._by_index[index]
+        except KeyError:
+            raise IndexError(f'No block with index {index}')
 
 
 if __name__ == '__main__':
@@ -232,6 +540,11 @@ if __name__ == '__main__':
     assert deserialized.timestamp == block.timestamp
     assert deserialized.data == block.data
     assert deserialized.public_key == block.public_key
+    try:
+        deserialized.index = 7
+        raise AssertionError('Block.index was reassigned, which would leave the memoized hash stale')
+    except AttributeError:
+        pass  # Expected, since header fields are read-only
     # TODO: Check that can't serialize if not signed
     try:
         Block.deserialize(serialized + b'2')
@@ -256,6 +569,42 @@ if __name__ == '__main__':
     except IndexError:
         pass  # Expected
     assert len(blockchain.blocks) == 3
+    blockchain.verify_chain()
+    Blockchain.verify(blockchain.blocks)
+    try:
+        Blockchain.verify([blockchain.blocks[0], blockchain.blocks[2]])
+        raise AssertionError('Blocks not linked, yet Blockchain.verify() didn\'t throw an exception')
+    except AssertionError as e:
+        assert 'Blockchain.verify' not in str(e)  # Expected, since block 1 is missing
+    block3 = Block(b'block3', blockchain.last_index + 1, blockchain.last_hash, public_key, time.time())
+    block3.sign(private_key)
+    block4 = Block(b'block4', blockchain.last_index + 2, block3.hash(), public_key, time.time())
+    block4.sign(private_key)
+    try:
+        blockchain.add_blocks([block3.serialize(), block4.serialize()[:-1] + b'5'])
+        raise AssertionError('Signature incorrect, yet add_blocks() didn\'t throw an exception')
+    except InvalidSignature:
+        pass  # Expected, since the second block was tinkered with
+    assert len(blockchain.blocks) == 3  # The good block must not have been added either
+    merkle_root = blockchain.merkle_root
+    block5 = Block(b'block5', blockchain.last_index + 2, blockchain.last_hash, public_key, time.time())
+    block5.sign(private_key)
+    try:
+        blockchain.add_blocks([block3.serialize(), block5.serialize()])
+        raise AssertionError('Index skipped, yet add_blocks() didn\'t throw an exception')
+    except AssertionError as e:
+        assert 'add_blocks' not in str(e)  # Expected, since the second block doesn't follow the first
+    assert len(blockchain.blocks) == 3 and blockchain.merkle_root == merkle_root
+    blockchain.add_blocks([block3.serialize()])  # The rolled back block can still be added afterwards
+    blockchain.verify_chain()
+    assert blockchain.get_block(3).data == b'block3'
+    dump = blockchain.dump()
+    assert Blockchain.from_dump(dump).merkle_root == blockchain.merkle_root
+    try:
+        Blockchain.from_dump(dump[:-1] + bytes([dump[-1] ^ 1]))
+        raise AssertionError('Signature incorrect, yet Blockchain.from_dump() didn\'t throw an exception')
+    except InvalidSignature:
+        pass  # Expected, since the last block was tinkered with
     # TODO: Tests for last_index, last_hash, timestamp
 
     # Blockchain saving / loading tests
@@ -269,6 +618,10 @@ if __name__ == '__main__':
     blockchain.save('test.blockchain')
     blockchain_restored = Blockchain.load('test.blockchain')
     os.remove('test.blockchain')
+    if zstandard is not None:
+        blockchain.save('test.blockchain.zst')
+        assert Blockchain.load('test.blockchain.zst').merkle_root == blockchain.merkle_root
+        os.remove('test.blockchain.zst')
     assert blockchain_restored.blocks[0].data == blockchain.blocks[0].data
     assert blockchain_restored.blocks[1].data == blockchain.blocks[1].data
     assert blockchain_restored.blocks[0].index == blockchain.blocks[0].index
@@ -279,6 +632,38 @@ if __name__ == '__main__':
     assert blockchain_restored.blocks[1].timestamp == blockchain.blocks[1].timestamp
     assert blockchain_restored.blocks[0].hash() == blockchain.blocks[0].hash()
     assert blockchain_restored.blocks[1].hash() == blockchain.blocks[1].hash()
+    assert blockchain_restored.merkle_root == blockchain.merkle_root
+
+    # Merkle proof tests
+    blockchain = Blockchain()
+    blockchain.add_block_zero()
+    private_key = generate_private_key()
+    public_key = generate_public_key(private_key)
+    for i in range(6):
+        block = Block(b'merkle', blockchain.last_index + 1, blockchain.last_hash, public_key, time.time())
+        block.sign(private_key)
+        blockchain.add_block(block.serialize())
+    for i in range(len(blockchain.blocks)):
+        assert blockchain.merkle_position(i) == i
+        Blockchain.verify_merkle_proof(blockchain.get_block(i).hash(), i, blockchain.merkle_proof(i),
+                                       blockchain.merkle_root)
+    for merkle_min_level, merkle_memoize_every in ((0, 1), (2, 3), (10, 1)):
+        sparse = Blockchain(merkle_min_level, merkle_memoize_every)
+        for block in blockchain.blocks:
+            sparse.add_block(block.serialize())
+        assert sparse.merkle_root == blockchain.merkle_root
+        assert sparse.merkle_proof(5) == blockchain.merkle_proof(5)
+    try:
+        Blockchain(1, 0)
+        raise AssertionError('merkle_memoize_every is 0, yet Blockchain() didn\'t throw an exception')
+    except AssertionError as e:
+        assert 'merkle_memoize_every' in str(e)  # Expected, since levels couldn't be stored every 0th level
+    try:
+        Blockchain.verify_merkle_proof(blockchain.get_block(1).hash(), 2, blockchain.merkle_proof(1),
+                                       blockchain.merkle_root)
+        raise AssertionError('Wrong position, yet verify_merkle_proof() didn\'t throw an exception')
+    except AssertionError as e:
+        assert 'Merkle' in str(e)  # Expected, since the proof was checked against the wrong position
 
 
 
@@ -1,3 +1,4 @@
+import functools
 import json
 from contextlib import asynccontextmanager
 
@@ -5,9 +6,11 @@ from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from blockchain import Blockchain
-from utils import b64
+from utils import b64, json_bytes
 
 BLOCKCHAIN_FILE = 'populated.blockchain'
+# Every cache below holds at most this many blocks' worth of results, so memory doesn't grow with the chain
+CACHE_SIZE = 4096
 blockchain: Blockchain = None
 
 
@@ -15,6 +18,9 @@ blockchain: Blockchain = None
 async def lifespan(app: FastAPI):
     global blockchain
     blockchain = Blockchain.load(BLOCKCHAIN_FILE, create=True)
+    get_json.cache_clear()
+    _block_json.cache_clear()
+    build_tree.cache_clear()
     yield
     blockchain.save(BLOCKCHAIN_FILE)
 
@@ -49,13 +55,11 @@ async def get_last_block():
     return Response(content=blockchain.last_block.serialize(), media_type='application/octet-stream')
 
 
-@app.get('/api/block/{block_index}')
-async def get_block_json(block_index: int):
-    try:
-        block = blockchain.get_block(block_index)
-    except IndexError:
-        raise HTTPException(status_code=404, detail='Block not found')
-    return {
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _block_json(block_index: int) -> bytes:
+    # Blocks never change once added, so the encoded response can be reused
+    block = blockchain.get_block(block_index)
+    return json_bytes({
         'signature_b64': b64(block.signature),
         'index': block.index,
         'previous_hash_b64': b64(block.previous_hash),
@@ -63,17 +67,43 @@ async def get_block_json(block_index: int):
         'timestamp': block.timestamp,
         'data_b64': b64(block.data),
         'sha256_b64': b64(block.hash())
+    })
+
+
+@app.get('/api/block/{block_index}')
+async def get_block_json(block_index: int):
+    try:
+        content = _block_json(block_index)
+    except IndexError:
+        raise HTTPException(status_code=404, detail='Block not found')
+    return Response(content=content, media_type='application/json')
+
+
+@app.get('/api/merkle_proof/{block_index}')
+async def get_merkle_proof_json(block_index: int):
+    try:
+        position = blockchain.merkle_position(block_index)
+        proof = blockchain.merkle_proof(block_index)
+    except IndexError:
+        raise HTTPException(status_code=404, detail='Block not found')
+    return {
+        'position': position,
+        'proof_b64': [b64(node) for node in proof],
+        'merkle_root_b64': b64(blockchain.merkle_root)
     }
 
 
+# Blocks are append-only, so a built subtree never changes and shared subtrees are only built once
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def build_tree(starting_block: int):
-    data = get_json(starting_block)
+    data = dict(get_json(starting_block))  # Copy so the cached block JSON isn't modified
     data['children'] = []
     for proportion, child_data in data['components']:
         data['children'].append(build_tree(child_data['blockchain_index']))
     return data
 
 
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def get_json(block_index):
     block = blockchain.get_block(block_index)
     return json.loads(block.data.decode())
@@ -1,5 +1,18 @@
 import base64
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def b64(data: bytes):
     return base64.b64encode(data).decode('utf-8')
+
+
+def json_bytes(data) -> bytes:
+    # orjson encodes straight to bytes, the fallback produces equivalent compact UTF-8 output
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()